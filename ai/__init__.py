@@ -1,3 +1,12 @@
 """Helpers for interacting with the Flatlogic AI proxy from Django code."""
 
-from .local_ai_api import LocalAIApi, create_response, request, decode_json_from_response  # noqa: F401
+__all__ = ["LocalAIApi", "create_response", "request", "decode_json_from_response"]
+
+
+def __getattr__(name):
+    # Resolved on first use so importing ``ai`` does not load the HTTP client.
+    if name in __all__:
+        from . import local_ai_api
+
+        return getattr(local_ai_api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
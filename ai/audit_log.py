@@ -0,0 +1,409 @@
+"""
+Buffered, rotating audit log for AI proxy calls.
+
+Request threads only append a small dict to an in-memory buffer; a single
+background writer per process drains it into size-rotated JSONL segments:
+
+    <dir>/ai-audit-000003-4711.jsonl       active segment of process 4711
+    <dir>/ai-audit-000002-4711.jsonl.gz    rotated segment (gzip when enabled)
+    <dir>/ai-audit-000002-4711.idx.json    per-segment index
+
+Worker processes sharing a directory never touch each other's segments: the
+pid suffix keeps names apart and segments are created with ``O_EXCL``.
+
+Each index holds the segment's time range, per-model and per-status counts
+and a sparse ``[ts, byte_offset]`` checkpoint every ``INDEX_STRIDE`` entries,
+so readers can skip whole segments and seek close to a start time.
+
+Configuration (environment, read once on first use):
+
+    AI_AUDIT_LOG_DIR       segment directory; auditing is disabled when unset
+    AI_AUDIT_MAX_BYTES     rotate once a segment reaches this size (16 MiB)
+    AI_AUDIT_COMPRESS      gzip rotated segments (true)
+    AI_AUDIT_BUFFER_SIZE   pending entries kept before new ones are dropped (10000)
+"""
+
+from __future__ import annotations
+
+import atexit
+import bisect
+import gzip
+import json
+import logging
+import mmap
+import os
+import re
+import shutil
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+__all__ = [
+    "AuditLog",
+    "get_audit_log",
+    "record",
+    "list_segments",
+    "read_index",
+    "segment_matches",
+    "iter_entries",
+]
+
+INDEX_STRIDE = 256
+# Failed calls carry the proxy's error message or raw response body; keep only a prefix.
+ERROR_MAX_CHARS = 200
+
+_SEGMENT_RE = re.compile(r"^(ai-audit-(\d{6})-(\d+))\.jsonl(\.gz)?$")
+_AUDIT_LOG: Optional["AuditLog"] = None
+_AUDIT_LOCK = threading.Lock()
+_AUDIT_DISABLED = False
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLog:
+    """Ring-buffered JSONL writer with size-based rotation."""
+
+    def __init__(self, directory: str, max_bytes: int = 16 * 1024 * 1024, compress: bool = True,
+                 buffer_size: int = 10000, flush_interval: float = 1.0) -> None:
+        self.directory = directory
+        self.max_bytes = max(int(max_bytes), 1024)
+        self.compress = compress
+        self.buffer_size = max(int(buffer_size), 1)
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._pid = os.getpid()
+        self._wake_at = max(self.buffer_size // 2, 1)
+
+        os.makedirs(directory, exist_ok=True)
+        self._open_segment(_next_sequence(directory))
+        self._thread = threading.Thread(target=self._run, name="ai-audit-writer", daemon=True)
+        self._thread.start()
+
+    def append(self, entry: Dict[str, Any]) -> bool:
+        """Queue an entry; returns False (and counts it) when the buffer is full."""
+        with self._cond:
+            if self._closed or len(self._buffer) >= self.buffer_size:
+                self.dropped += 1
+                return False
+            # Stamped under the lock so entries reach disk in timestamp order.
+            entry["ts"] = time.time()
+            self._buffer.append(entry)
+            if len(self._buffer) >= self._wake_at:
+                self._cond.notify()
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            pending = len(self._buffer)
+        return {"written": self.written, "dropped": self.dropped, "pending": pending}
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Drain pending entries, finalise the active segment and stop the writer."""
+        if self._pid != os.getpid():
+            # Inherited across fork: the writer thread and segment belong to the parent.
+            return
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._buffer and not self._closed:
+                    self._cond.wait(self.flush_interval)
+                batch, self._buffer = self._buffer, deque()
+                closing = self._closed
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except Exception:  # pylint: disable=broad-except
+                    # Keep the writer alive; the next batch reopens a segment if needed.
+                    logger.exception("AI audit writer failed; dropping %d entries.", len(batch))
+                    with self._cond:
+                        self.dropped += len(batch)
+            if closing:
+                break
+        if not self._handle.closed:
+            try:
+                self._finish_segment(compress=False)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Could not finalise AI audit segment %s.", self._path)
+
+    def _write_batch(self, batch: Deque[Dict[str, Any]]) -> None:
+        """Write *batch*, removing each entry once it is on disk."""
+        if self._handle.closed:
+            self._open_segment(self._seq + 1)
+        while batch:
+            entry = batch[0]
+            line = (json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+            index = self._index
+            if index["count"] % INDEX_STRIDE == 0:
+                index["offsets"].append([entry["ts"], self._offset])
+            self._handle.write(line)
+            self._offset += len(line)
+            self.written += 1
+
+            index["count"] += 1
+            if index["first_ts"] is None:
+                index["first_ts"] = entry["ts"]
+            index["last_ts"] = entry["ts"]
+            model = str(entry.get("model") or "")
+            status = str(entry.get("status") or "")
+            index["models"][model] = index["models"].get(model, 0) + 1
+            index["statuses"][status] = index["statuses"].get(status, 0) + 1
+            batch.popleft()
+
+            if self._offset >= self.max_bytes:
+                self._rotate()
+        self._handle.flush()
+        self._write_index()
+
+    def _rotate(self) -> None:
+        try:
+            self._finish_segment(compress=self.compress)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Could not finalise AI audit segment %s.", self._path)
+        self._open_segment(self._seq + 1)
+
+    def _open_segment(self, seq: int) -> None:
+        pid = os.getpid()
+        while True:
+            stem = os.path.join(self.directory, f"ai-audit-{seq:06d}-{pid}")
+            if os.path.exists(stem + ".jsonl.gz"):
+                seq += 1
+                continue
+            try:
+                fd = os.open(stem + ".jsonl", os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_APPEND, 0o644)
+            except FileExistsError:
+                seq += 1
+                continue
+            break
+        self._seq = seq
+        self._stem = stem
+        self._path = stem + ".jsonl"
+        self._handle = os.fdopen(fd, "ab")
+        self._offset = 0
+        self._dropped_at_open = self.dropped
+        self._index: Dict[str, Any] = {
+            "segment": os.path.basename(self._path),
+            "count": 0,
+            "first_ts": None,
+            "last_ts": None,
+            "models": {},
+            "statuses": {},
+            "offsets": [],
+            "dropped": 0,
+        }
+
+    def _finish_segment(self, compress: bool) -> None:
+        self._handle.close()
+        if not self._index["count"]:
+            _remove_quietly(self._path)
+            _remove_quietly(self._stem + ".idx.json")
+            return
+        self._write_index()
+        if compress:
+            gz_path = self._path + ".gz"
+            try:
+                with open(self._path, "rb") as src, gzip.open(gz_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+            except Exception:
+                # The plain segment and its index are still complete.
+                _remove_quietly(gz_path)
+                raise
+            self._index["segment"] = os.path.basename(gz_path)
+            self._write_index()
+            os.remove(self._path)
+
+    def _write_index(self) -> None:
+        self._index["dropped"] = self.dropped - self._dropped_at_open
+        path = self._stem + ".idx.json"
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(self._index, handle, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+
+def _reset_after_fork() -> None:
+    """Forget the parent's audit log so a forked worker starts its own writer."""
+    global _AUDIT_LOG, _AUDIT_DISABLED, _AUDIT_LOCK  # noqa: PLW0603
+    _AUDIT_LOG = None
+    _AUDIT_DISABLED = False
+    _AUDIT_LOCK = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_audit_log() -> Optional[AuditLog]:
+    """Return the process-wide audit log, or None when AI_AUDIT_LOG_DIR is unset."""
+    global _AUDIT_LOG, _AUDIT_DISABLED  # noqa: PLW0603
+    if _AUDIT_LOG is not None or _AUDIT_DISABLED:
+        return _AUDIT_LOG
+
+    with _AUDIT_LOCK:
+        if _AUDIT_LOG is not None or _AUDIT_DISABLED:
+            return _AUDIT_LOG
+        directory = os.getenv("AI_AUDIT_LOG_DIR")
+        if not directory:
+            _AUDIT_DISABLED = True
+            return None
+        try:
+            _AUDIT_LOG = AuditLog(
+                directory,
+                max_bytes=int(os.getenv("AI_AUDIT_MAX_BYTES", str(16 * 1024 * 1024))),
+                compress=os.getenv("AI_AUDIT_COMPRESS", "true").lower() not in {"0", "false", "no"},
+                buffer_size=int(os.getenv("AI_AUDIT_BUFFER_SIZE", "10000")),
+            )
+        except (OSError, ValueError):
+            _AUDIT_DISABLED = True
+            return None
+        atexit.register(_AUDIT_LOG.close)
+    return _AUDIT_LOG
+
+
+def record(method: str, url: str, model: Optional[str], result: Dict[str, Any],
+           started: float, request_bytes: int = 0) -> None:
+    """Queue an audit entry for a finished proxy call; no-op when auditing is off."""
+    audit_log = get_audit_log()
+    if audit_log is None:
+        return
+
+    data = result.get("data")
+    entry: Dict[str, Any] = {
+        "method": method,
+        "url": url,
+        "model": model,
+        "status": result.get("status") or _truncate(result.get("error")),
+        "success": bool(result.get("success")),
+        "latency_ms": round((time.time() - started) * 1000, 1),
+        "request_bytes": request_bytes,
+    }
+    if isinstance(data, dict) and data.get("ai_request_id") is not None:
+        entry["ai_request_id"] = data["ai_request_id"]
+    if not result.get("success"):
+        entry["error"] = _truncate(result.get("error"))
+    audit_log.append(entry)
+
+
+def list_segments(directory: str) -> List[str]:
+    """Return the path of every segment in *directory*, oldest sequence first."""
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    segments: Dict[str, Tuple[int, int, str]] = {}
+    for name in names:
+        match = _SEGMENT_RE.match(name)
+        if not match:
+            continue
+        stem = match.group(1)
+        # A plain file next to its .gz means compression did not finish; the plain one is complete.
+        if stem in segments and match.group(4):
+            continue
+        segments[stem] = (int(match.group(2)), int(match.group(3)), os.path.join(directory, name))
+    return [path for _, _, path in sorted(segments.values())]
+
+
+def read_index(path: str) -> Optional[Dict[str, Any]]:
+    """Load the index stored next to segment *path*, if any."""
+    stem = path[:-3] if path.endswith(".gz") else path
+    try:
+        with open(stem[:-len(".jsonl")] + ".idx.json", "r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def segment_matches(index: Optional[Dict[str, Any]], since: Optional[float] = None,
+                    until: Optional[float] = None, model: Optional[str] = None,
+                    status: Optional[str] = None) -> bool:
+    """Cheap pre-filter on a segment index; segments without one are always scanned."""
+    if index is None:
+        return True
+    if not index.get("count"):
+        return False
+    if since is not None and index["last_ts"] < since:
+        return False
+    if until is not None and index["first_ts"] > until:
+        return False
+    if model is not None and model not in index.get("models", {}):
+        return False
+    if status is not None and status not in index.get("statuses", {}):
+        return False
+    return True
+
+
+def iter_entries(path: str, index: Optional[Dict[str, Any]] = None, since: Optional[float] = None,
+                 until: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """Yield entries from one segment within ``[since, until]``.
+
+    Plain segments are memory-mapped; gzip segments are inflated into memory.
+    """
+    if path.endswith(".gz"):
+        with gzip.open(path, "rb") as handle:
+            yield from _scan(handle.read(), index, since, until)
+        return
+
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            yield from _scan(buf, index, since, until)
+
+
+def _scan(buf: Any, index: Optional[Dict[str, Any]], since: Optional[float],
+          until: Optional[float]) -> Iterator[Dict[str, Any]]:
+    pos = 0
+    if since is not None and index and index.get("offsets"):
+        offsets = index["offsets"]
+        slot = bisect.bisect_right([ts for ts, _ in offsets], since) - 1
+        if slot > 0:
+            pos = offsets[slot][1]
+
+    size = len(buf)
+    while pos < size:
+        end = buf.find(b"\n", pos)
+        if end == -1:
+            # Partial trailing line from a writer that is still running.
+            return
+        line = buf[pos:end]
+        pos = end + 1
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        ts = entry.get("ts", 0)
+        if since is not None and ts < since:
+            continue
+        if until is not None and ts > until:
+            return
+        yield entry
+
+
+def _next_sequence(directory: str) -> int:
+    sequences = [int(_SEGMENT_RE.match(os.path.basename(path)).group(2)) for path in list_segments(directory)]
+    return max(sequences) + 1 if sequences else 0
+
+
+def _truncate(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    text = value if isinstance(value, str) else str(value)
+    return text if len(text) <= ERROR_MAX_CHARS else text[:ERROR_MAX_CHARS] + "..."
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -29,7 +29,8 @@ Usage (inside the Django workspace):
 # }
 
 The helper automatically injects the project UUID header and falls back to
-reading executor/.env if environment variables are missing.
+reading executor/.env if environment variables are missing. When
+AI_AUDIT_LOG_DIR is set, every proxy call is recorded by ``ai.audit_log``.
 """
 
 from __future__ import annotations
@@ -37,10 +38,7 @@ from __future__ import annotations
 import json
 import os
 import time
-import ssl
 from typing import Any, Dict, Iterable, Optional
-from urllib import error as urlerror
-from urllib import request as urlrequest
 
 __all__ = [
     "LocalAIApi",
@@ -50,6 +48,7 @@ __all__ = [
     "await_response",
     "extract_text",
     "decode_json_from_response",
+    "warm_up",
 ]
 
 
@@ -154,7 +153,10 @@ def request(path: Optional[str], payload: Dict[str, Any], options: Optional[Dict
                 headers[name.strip()] = value.strip()
 
     body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-    return _http_request(url, "POST", body, headers, timeout, verify_tls)
+    started = time.time()
+    result = _http_request(url, "POST", body, headers, timeout, verify_tls)
+    _audit("POST", url, payload.get("model"), result, started, len(body))
+    return result
 
 
 def fetch_status(ai_request_id: Any, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -188,7 +190,10 @@ def fetch_status(ai_request_id: Any, options: Optional[Dict[str, Any]] = None) -
                 name, value = header.split(":", 1)
                 headers[name.strip()] = value.strip()
 
-    return _http_request(url, "GET", None, headers, timeout, verify_tls)
+    started = time.time()
+    result = _http_request(url, "GET", None, headers, timeout, verify_tls)
+    _audit("GET", url, None, result, started)
+    return result
 
 
 def await_response(ai_request_id: Any, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -271,6 +276,16 @@ def decode_json_from_response(response: Dict[str, Any]) -> Optional[Dict[str, An
     return None
 
 
+def warm_up() -> None:
+    """Load AI config and the HTTP stack ahead of the first request.
+
+    Safe to call before the server forks; the audit writer is started per worker.
+    """
+    _config()
+    import ssl  # noqa: F401
+    from urllib import request as urlrequest  # noqa: F401
+
+
 def _extract_text(response: Dict[str, Any]) -> str:
     payload = response.get("data") if response.get("success") else response.get("response")
     if isinstance(payload, dict):
@@ -344,6 +359,11 @@ def _http_request(url: str, method: str, body: Optional[bytes], headers: Dict[st
     """
     Shared HTTP helper for GET/POST requests.
     """
+    # Imported here: urllib.request and ssl dominate this module's import time.
+    import ssl
+    from urllib import error as urlerror
+    from urllib import request as urlrequest
+
     req = urlrequest.Request(url, data=body, method=method.upper())
     for name, value in headers.items():
         req.add_header(name, value)
@@ -396,6 +416,16 @@ def _http_request(url: str, method: str, body: Optional[bytes], headers: Dict[st
     }
 
 
+def _audit(method: str, url: str, model: Optional[str], result: Dict[str, Any],
+           started: float, request_bytes: int = 0) -> None:
+    # ai.audit_log (gzip, mmap, threading) is only imported when auditing is enabled.
+    if not os.getenv("AI_AUDIT_LOG_DIR"):
+        return
+    from . import audit_log
+
+    audit_log.record(method, url, model, result, started, request_bytes)
+
+
 def _ensure_env_loaded() -> None:
     """Populate os.environ from executor/.env if variables are missing."""
     if os.getenv("PROJECT_UUID") and os.getenv("PROJECT_ID"):
@@ -12,10 +12,14 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
-from dotenv import load_dotenv
 
 BASE_DIR = Path(__file__).resolve().parent.parent
-load_dotenv(BASE_DIR.parent / ".env")
+ENV_FILE = BASE_DIR.parent / ".env"
+if ENV_FILE.exists():
+    # Imported only when there is a file to load; dotenv costs ~4 ms per worker boot.
+    from dotenv import load_dotenv
+
+    load_dotenv(ENV_FILE)
 
 SECRET_KEY = os.getenv("DJANGO_SECRET_KEY", "change-me")
 DEBUG = os.getenv("DJANGO_DEBUG", "true").lower() == "true"
@@ -104,6 +108,10 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASS', ''),
         'HOST': os.getenv('DB_HOST', '127.0.0.1'),
         'PORT': os.getenv('DB_PORT', '3306'),
+        # Opt-in persistent connections for WSGI workers (see README, "Worker warm-up").
+        # Leave at 0 under ASGI, where per-thread persistent connections leak.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '0')),
+        'CONN_HEALTH_CHECKS': True,
         'OPTIONS': {
             'charset': 'utf8mb4',
         },
@@ -155,6 +163,13 @@ STATICFILES_DIRS = [
     BASE_DIR / 'node_modules',
 ]
 
+# Allowlist used by `manage.py collect_assets` on top of template references,
+# so only the vendor builds we serve are copied out of node_modules.
+STATIC_ASSET_MANIFEST = BASE_DIR / 'static_assets.txt'
+# Records source hashes between runs so unchanged files are not copied again.
+# Kept outside STATIC_ROOT, which is served publicly.
+STATIC_COLLECT_STATE = BASE_DIR / '.static_collect_state.json'
+
 # Email
 EMAIL_BACKEND = os.getenv(
     "EMAIL_BACKEND",
@@ -14,3 +14,12 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Compile templates, load the URLconf and read AI config before the first
+# request. Fork-safe, so it also works with preloading servers; per-worker
+# warm-up (DB, audit writer) belongs in a server hook, see README.
+# Set DJANGO_WARMUP=false to skip.
+if os.getenv("DJANGO_WARMUP", "true").lower() == "true":
+    from core.warmup import warm_up
+
+    warm_up()
@@ -0,0 +1,276 @@
+"""
+Columnar, incremental donor eligibility engine.
+
+Donor attributes live in NumPy columns (dates stored as proleptic ordinals)
+and every rule collapses into two precomputed columns per donor:
+
+    eligible_from   first day the donor may donate (interval, deferral, minimum age)
+    eligible_until  first day the donor is too old to donate
+
+plus a hemoglobin flag. Rules are evaluated as array expressions over a whole
+batch of rows, and match queries are a boolean mask over the derived columns.
+
+Recording a donation or deferral re-evaluates that one row and pushes a
+"becomes eligible on date X" event onto a heap. ``advance(today)`` publishes
+every event that has come due to subscribers without rescanning donors.
+
+Usage:
+
+    engine = EligibilityEngine()
+    engine.load([
+        {"donor_id": 1, "birth_date": date(1990, 4, 2), "last_donation": date(2026, 9, 1),
+         "hemoglobin": 13.8},
+    ])
+    engine.subscribe(lambda donor_id, eligible_on: ...)
+    engine.record_donation(1, date(2026, 10, 19), hemoglobin=14.1)
+    engine.eligible_ids(candidates=[1, 2, 3])
+    engine.advance()  # call daily
+"""
+
+from __future__ import annotations
+
+import heapq
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+__all__ = ["EligibilityRules", "EligibilityEngine"]
+
+# Ordinal used for "no date recorded"; date.min.toordinal() == 1.
+_NO_DATE = 0
+_NEVER = date.max.toordinal()
+_UNIX_EPOCH = date(1970, 1, 1).toordinal()
+
+
+class EligibilityRules:
+    """Thresholds applied by the engine (whole-blood defaults)."""
+
+    def __init__(self, min_interval_days: int = 56, min_age: int = 18, max_age: int = 65,
+                 min_hemoglobin: float = 12.5) -> None:
+        self.min_interval_days = min_interval_days
+        self.min_age = min_age
+        self.max_age = max_age
+        self.min_hemoglobin = min_hemoglobin
+
+
+class EligibilityEngine:
+    """Precomputed eligibility table over NumPy donor columns."""
+
+    def __init__(self, rules: Optional[EligibilityRules] = None) -> None:
+        self.rules = rules or EligibilityRules()
+        self._rows: Dict[Any, int] = {}
+        self._size = 0
+
+        # Source columns; allocated with spare capacity and grown geometrically.
+        self._ids = np.empty(0, dtype=object)
+        self._birth = np.empty(0, dtype=np.int32)
+        self._last_donation = np.empty(0, dtype=np.int32)
+        self._deferral_until = np.empty(0, dtype=np.int32)
+        self._hemoglobin = np.empty(0, dtype=np.float64)
+
+        # Derived columns.
+        self._eligible_from = np.empty(0, dtype=np.int32)
+        self._eligible_until = np.empty(0, dtype=np.int32)
+        self._hemoglobin_ok = np.empty(0, dtype=bool)
+
+        self._events: List[Tuple[int, int, int]] = []
+        self._versions = np.empty(0, dtype=np.int64)
+        # Donors already eligible before the engine starts are not announced.
+        self._published_through = date.today().toordinal()
+        self._subscribers: List[Callable[[Any, date], None]] = []
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, donor_id: Any) -> bool:
+        return donor_id in self._rows
+
+    def load(self, donors: Iterable[Mapping[str, Any]]) -> None:
+        """Bulk-add donors and evaluate the new rows as one batch.
+
+        The batch is validated before anything is stored, so a bad record leaves
+        the engine unchanged.
+        """
+        ids: List[Any] = []
+        births: List[int] = []
+        last_donations: List[int] = []
+        deferrals: List[int] = []
+        hemoglobins: List[float] = []
+        seen = set()
+        for donor in donors:
+            donor_id = donor["donor_id"]
+            if donor_id in self._rows or donor_id in seen:
+                raise ValueError(f"Donor {donor_id!r} is already loaded.")
+            seen.add(donor_id)
+            ids.append(donor_id)
+            births.append(_ordinal(donor.get("birth_date")))
+            last_donations.append(_ordinal(donor.get("last_donation")))
+            deferrals.append(_ordinal(donor.get("deferral_until")))
+            hemoglobin = donor.get("hemoglobin")
+            hemoglobins.append(float("nan") if hemoglobin is None else float(hemoglobin))
+
+        start = self._size
+        stop = start + len(ids)
+        self._reserve(stop)
+        # fromiter keeps tuple ids as single objects instead of broadcasting them.
+        self._ids[start:stop] = np.fromiter(ids, dtype=object, count=len(ids))
+        self._birth[start:stop] = births
+        self._last_donation[start:stop] = last_donations
+        self._deferral_until[start:stop] = deferrals
+        self._hemoglobin[start:stop] = hemoglobins
+        self._versions[start:stop] = 0
+        self._rows.update((donor_id, row) for row, donor_id in enumerate(ids, start))
+        self._size = stop
+        self._evaluate(start, stop, announce_flips=False)
+
+    def record_donation(self, donor_id: Any, on: date, hemoglobin: Optional[float] = None) -> Optional[date]:
+        """Record a donation and return the donor's next eligible date."""
+        row = self._row(donor_id)
+        day = on.toordinal()
+        if day > self._last_donation[row]:
+            self._last_donation[row] = day
+        if hemoglobin is not None:
+            self._hemoglobin[row] = float(hemoglobin)
+        self._evaluate(row, row + 1)
+        return self.eligible_on(donor_id)
+
+    def record_deferral(self, donor_id: Any, until: Optional[date]) -> Optional[date]:
+        """Defer a donor until *until* (None for a permanent deferral)."""
+        row = self._row(donor_id)
+        self._deferral_until[row] = _NEVER if until is None else max(until.toordinal(), int(self._deferral_until[row]))
+        self._evaluate(row, row + 1)
+        return self.eligible_on(donor_id)
+
+    def clear_deferral(self, donor_id: Any) -> Optional[date]:
+        row = self._row(donor_id)
+        self._deferral_until[row] = _NO_DATE
+        self._evaluate(row, row + 1)
+        return self.eligible_on(donor_id)
+
+    def is_eligible(self, donor_id: Any, on: Optional[date] = None) -> bool:
+        row = self._row(donor_id)
+        day = (on or date.today()).toordinal()
+        return bool(self._hemoglobin_ok[row]) and int(self._eligible_from[row]) <= day < int(self._eligible_until[row])
+
+    def eligible_on(self, donor_id: Any, on: Optional[date] = None) -> Optional[date]:
+        """First date the donor can donate, or None if they cannot on or after *on*.
+
+        *on* defaults to the engine clock (the last day passed to ``advance()``,
+        today before that), so answers agree with pending events. Donors no rule
+        restricts get ``date.min``.
+        """
+        row = self._row(donor_id)
+        day = on.toordinal() if on else self._published_through
+        start = int(self._eligible_from[row])
+        end = int(self._eligible_until[row])
+        if not self._hemoglobin_ok[row] or start >= end or end <= day:
+            return None
+        return date.fromordinal(max(start, date.min.toordinal()))
+
+    def eligible_ids(self, on: Optional[date] = None, candidates: Optional[Iterable[Any]] = None) -> List[Any]:
+        """Return eligible donor ids, optionally restricted to *candidates*."""
+        day = (on or date.today()).toordinal()
+        if candidates is None:
+            return self._ids[np.flatnonzero(self._eligible_mask(day, slice(0, self._size)))].tolist()
+        rows = self._rows
+        selected = np.fromiter((rows[donor_id] for donor_id in candidates if donor_id in rows), dtype=np.intp)
+        return self._ids[selected[self._eligible_mask(day, selected)]].tolist()
+
+    def subscribe(self, callback: Callable[[Any, date], None]) -> None:
+        """Register ``callback(donor_id, eligible_on)`` for eligibility events."""
+        self._subscribers.append(callback)
+
+    def advance(self, today: Optional[date] = None) -> List[Tuple[Any, date]]:
+        """Publish every "becomes eligible" event due on or before *today*."""
+        day = (today or date.today()).toordinal()
+        published: List[Tuple[Any, date]] = []
+        events = self._events
+        while events and events[0][0] <= day:
+            start, row, version = heapq.heappop(events)
+            if version != self._versions[row]:
+                continue
+            event = (self._ids[row], date.fromordinal(start))
+            published.append(event)
+            for callback in self._subscribers:
+                callback(*event)
+        self._published_through = max(self._published_through, day)
+        return published
+
+    def _row(self, donor_id: Any) -> int:
+        try:
+            return self._rows[donor_id]
+        except KeyError:
+            raise KeyError(f"Unknown donor {donor_id!r}.") from None
+
+    def _reserve(self, size: int) -> None:
+        capacity = len(self._birth)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2, 1024)
+        for name in ("_ids", "_birth", "_last_donation", "_deferral_until", "_hemoglobin",
+                     "_eligible_from", "_eligible_until", "_hemoglobin_ok", "_versions"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def _eligible_mask(self, day: int, rows: Any) -> np.ndarray:
+        return self._hemoglobin_ok[rows] & (self._eligible_from[rows] <= day) & (day < self._eligible_until[rows])
+
+    def _evaluate(self, start: int, stop: int, announce_flips: bool = True) -> None:
+        """Recompute the derived columns for rows ``[start, stop)`` as array operations.
+
+        With *announce_flips*, rows that become eligible on or before the last
+        published day get an event dated that day instead of being skipped.
+        """
+        rules = self.rules
+        rows = slice(start, stop)
+        published_through = self._published_through
+        if announce_flips:
+            was_eligible = self._eligible_mask(published_through, rows)
+
+        birth = self._birth[rows]
+        last = self._last_donation[rows]
+        known_birth = birth != _NO_DATE
+        eligible_from = np.maximum.reduce([
+            np.where(last != _NO_DATE, last + rules.min_interval_days, _NO_DATE),
+            self._deferral_until[rows],
+            np.where(known_birth, _add_years(birth, rules.min_age), _NO_DATE),
+        ])
+        eligible_until = np.where(known_birth, _add_years(birth, rules.max_age + 1), _NEVER)
+        hemoglobin = self._hemoglobin[rows]
+        # Unknown hemoglobin is measured at the collection site, so it does not block matching.
+        hemoglobin_ok = np.isnan(hemoglobin) | (hemoglobin >= rules.min_hemoglobin)
+
+        self._eligible_from[rows] = eligible_from
+        self._eligible_until[rows] = eligible_until
+        self._hemoglobin_ok[rows] = hemoglobin_ok
+        self._versions[rows] += 1
+
+        can_donate = hemoglobin_ok & (eligible_from < eligible_until)
+        future = can_donate & (eligible_from > published_through)
+        event_day = eligible_from.astype(np.int64)
+        if announce_flips:
+            flipped = ~was_eligible & self._eligible_mask(published_through, rows)
+            event_day[flipped] = published_through
+            future |= flipped
+
+        events = self._events
+        versions = self._versions
+        for offset in np.flatnonzero(future).tolist():
+            row = start + offset
+            heapq.heappush(events, (int(event_day[offset]), row, int(versions[row])))
+
+
+def _ordinal(value: Optional[date]) -> int:
+    return value.toordinal() if value else _NO_DATE
+
+
+def _add_years(ordinals: np.ndarray, years: int) -> np.ndarray:
+    """Add *years* to date ordinals; 29 February maps to 1 March in non-leap years."""
+    days = (ordinals.astype(np.int64) - _UNIX_EPOCH).astype("datetime64[D]")
+    months = days.astype("datetime64[M]")
+    day_of_month = (days - months.astype("datetime64[D]")).astype(np.int64)
+    shifted = (months.astype(np.int64) + 12 * years).astype("datetime64[M]")
+    return (shifted.astype("datetime64[D]").astype(np.int64) + day_of_month + _UNIX_EPOCH).astype(np.int32)
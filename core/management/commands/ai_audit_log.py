@@ -0,0 +1,97 @@
+import json
+import os
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ai import audit_log
+
+
+class Command(BaseCommand):
+    help = "Filter and aggregate the AI proxy audit log by time range, model and status."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            default=os.getenv("AI_AUDIT_LOG_DIR", ""),
+            help="Audit log directory (defaults to AI_AUDIT_LOG_DIR).",
+        )
+        parser.add_argument("--since", help="Start of range: ISO 8601 datetime or Unix timestamp.")
+        parser.add_argument("--until", help="End of range: ISO 8601 datetime or Unix timestamp.")
+        parser.add_argument("--model", help="Only include calls for this model.")
+        parser.add_argument("--status", help="Only include calls with this HTTP status or error code.")
+        parser.add_argument(
+            "--entries",
+            type=int,
+            default=0,
+            metavar="N",
+            help="Also print up to N matching entries as JSON lines.",
+        )
+
+    def handle(self, *args, **options):
+        directory = options["dir"]
+        if not directory:
+            raise CommandError("No audit log directory; pass --dir or set AI_AUDIT_LOG_DIR.")
+
+        since = _parse_time(options["since"], "--since")
+        until = _parse_time(options["until"], "--until")
+        model = options["model"]
+        status = options["status"]
+        limit = options["entries"]
+
+        groups = {}
+        scanned = skipped = dropped = printed = 0
+        for path in audit_log.list_segments(directory):
+            index = audit_log.read_index(path)
+            if index:
+                dropped += index.get("dropped", 0)
+            if not audit_log.segment_matches(index, since, until, model, status):
+                skipped += 1
+                continue
+            scanned += 1
+            for entry in audit_log.iter_entries(path, index, since, until):
+                entry_model = str(entry.get("model") or "")
+                entry_status = str(entry.get("status") or "")
+                if model is not None and entry_model != model:
+                    continue
+                if status is not None and entry_status != status:
+                    continue
+
+                if printed < limit:
+                    self.stdout.write(json.dumps(entry, ensure_ascii=False))
+                    printed += 1
+
+                group = groups.setdefault((entry_model, entry_status), [0, 0.0, 0.0])
+                latency = float(entry.get("latency_ms") or 0)
+                group[0] += 1
+                group[1] += latency
+                group[2] = max(group[2], latency)
+
+        self.stdout.write(f"{'model':<24} {'status':<20} {'count':>8} {'avg ms':>10} {'max ms':>10}")
+        total = 0
+        for (entry_model, entry_status), (count, latency_sum, latency_max) in sorted(groups.items()):
+            total += count
+            self.stdout.write(
+                f"{entry_model or '-':<24} {entry_status or '-':<20} {count:>8} "
+                f"{latency_sum / count:>10.1f} {latency_max:>10.1f}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} entries; {scanned} segments scanned, {skipped} skipped by index, "
+            f"{dropped} entries dropped under load."
+        ))
+
+
+def _parse_time(value, flag):
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError as exc:
+        raise CommandError(f"{flag} must be an ISO 8601 datetime or Unix timestamp.") from exc
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt_timezone.utc)
+    return parsed.timestamp()
@@ -0,0 +1,245 @@
+import fnmatch
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles.finders import get_finders
+from django.core.management.base import BaseCommand, CommandError
+
+STATIC_TAG_RE = re.compile(r"""\{%\s*static\s+['"]([^'"]+)['"]""")
+TEMPLATE_SUFFIXES = {".html", ".txt", ".xml"}
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".mjs", ".json", ".map", ".svg", ".txt", ".html", ".xml"}
+DEFAULT_IGNORE_PATTERNS = ["CVS", ".*", "*~"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Collect only the static files referenced from templates or listed in "
+        "STATIC_ASSET_MANIFEST, skipping unchanged files and precompressing in parallel."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of parallel copy/compress workers (defaults to the CPU count).",
+        )
+        parser.add_argument("--no-compress", action="store_true", help="Do not write .gz variants.")
+        parser.add_argument("--force", action="store_true", help="Ignore the state file and copy every file.")
+        parser.add_argument("--dry-run", action="store_true", help="List selected files without copying.")
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Delete every file in STATIC_ROOT that is not part of the current selection.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        if not settings.STATIC_ROOT:
+            raise CommandError("STATIC_ROOT is not set.")
+        static_root = Path(settings.STATIC_ROOT)
+        state_path = Path(getattr(settings, "STATIC_COLLECT_STATE", Path(settings.BASE_DIR) / ".static_collect_state.json"))
+        compress = not options["no_compress"]
+
+        referenced = _template_references()
+        patterns = _manifest_patterns(getattr(settings, "STATIC_ASSET_MANIFEST", None))
+
+        selected = {}
+        available = excluded_bytes = 0
+        for finder in get_finders():
+            for path, storage in finder.list(DEFAULT_IGNORE_PATTERNS):
+                prefix = getattr(storage, "prefix", None)
+                prefixed = f"{prefix}/{path}" if prefix else path
+                prefixed = prefixed.replace(os.sep, "/")
+                if prefixed in selected:
+                    continue
+                source = storage.path(path)
+                available += 1
+                if prefixed in referenced or any(fnmatch.fnmatchcase(prefixed, pattern) for pattern in patterns):
+                    selected[prefixed] = source
+                else:
+                    excluded_bytes += os.path.getsize(source)
+
+        missing = sorted(referenced - selected.keys())
+        for path in missing:
+            self.stderr.write(self.style.WARNING(f"Template references missing static file: {path}"))
+
+        if options["dry_run"]:
+            for path in sorted(selected):
+                self.stdout.write(path)
+            self.stdout.write(f"{len(selected)} of {available} files selected.")
+            return
+
+        previous = {} if options["force"] else _load_state(state_path)
+        jobs = [
+            (path, source, static_root / path, previous.get(path), compress)
+            for path, source in sorted(selected.items())
+        ]
+        with ThreadPoolExecutor(max_workers=max(options["workers"], 1)) as pool:
+            results = list(pool.map(_collect_one, jobs))
+
+        state = {}
+        copied = skipped = copied_bytes = skipped_bytes = gzip_saved = 0
+        for path, entry, was_copied in results:
+            state[path] = entry
+            if was_copied:
+                copied += 1
+                copied_bytes += entry["size"]
+            else:
+                skipped += 1
+                skipped_bytes += entry["size"]
+            gzip_saved += entry.get("gzip_saved", 0)
+
+        removed = removed_bytes = 0
+        if options["prune"]:
+            removed, removed_bytes = _prune(static_root, state)
+
+        _save_state(state_path, state)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{copied} copied ({_format_bytes(copied_bytes)}), {skipped} unchanged "
+            f"({_format_bytes(skipped_bytes)} not rewritten), {removed} unselected removed "
+            f"({_format_bytes(removed_bytes)}); "
+            f"{available - len(selected)} files ({_format_bytes(excluded_bytes)}) left out; "
+            f"gzip saves {_format_bytes(gzip_saved)} on the wire; {elapsed:.2f}s."
+        ))
+
+
+def _collect_one(job):
+    path, source, target, previous, compress = job
+    stat = os.stat(source)
+    gz_target = target.with_name(target.name + ".gz")
+    wants_gzip = compress and target.suffix.lower() in COMPRESSIBLE_SUFFIXES
+    entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "gzip": wants_gzip}
+
+    def outputs_present():
+        # A .gz variant is only kept when it is smaller than the original.
+        return previous.get("gzip", False) == wants_gzip and target.is_file() \
+            and ("gzip_saved" not in previous or gz_target.is_file())
+
+    # Fast path: same size and mtime as last run, so the content hash is reused.
+    if previous and previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns \
+            and outputs_present():
+        return path, previous, False
+
+    digest = _sha256(source)
+    entry["sha256"] = digest
+    if previous and previous.get("sha256") == digest and outputs_present():
+        if "gzip_saved" in previous:
+            entry["gzip_saved"] = previous["gzip_saved"]
+        return path, entry, False
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    _replace_atomically(target, lambda tmp_path: shutil.copyfile(source, tmp_path))
+    if wants_gzip:
+        with open(source, "rb") as handle:
+            compressed = gzip.compress(handle.read(), compresslevel=9, mtime=0)
+        if len(compressed) < stat.st_size:
+            _replace_atomically(gz_target, lambda tmp_path: Path(tmp_path).write_bytes(compressed))
+            entry["gzip_saved"] = stat.st_size - len(compressed)
+            return path, entry, True
+    if gz_target.exists():
+        gz_target.unlink()
+    return path, entry, True
+
+
+def _replace_atomically(target, write):
+    """Write through a temp file in the target directory so readers never see a partial file."""
+    fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, target)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _prune(static_root, state):
+    """Delete everything under *static_root* that the current run did not select."""
+    keep = set(state)
+    keep.update(f"{path}.gz" for path, entry in state.items() if "gzip_saved" in entry)
+    removed = removed_bytes = 0
+    for directory, _, files in os.walk(static_root, topdown=False):
+        for name in files:
+            full_path = os.path.join(directory, name)
+            if os.path.relpath(full_path, static_root).replace(os.sep, "/") in keep:
+                continue
+            removed_bytes += os.path.getsize(full_path)
+            os.unlink(full_path)
+            removed += 1
+        if directory != str(static_root) and not os.listdir(directory):
+            os.rmdir(directory)
+    return removed, removed_bytes
+
+
+def _template_references():
+    directories = []
+    for engine in settings.TEMPLATES:
+        directories.extend(Path(directory) for directory in engine.get("DIRS", []))
+        if engine.get("APP_DIRS"):
+            directories.extend(Path(app.path) / "templates" for app in apps.get_app_configs())
+
+    referenced = set()
+    for directory in directories:
+        if not directory.is_dir():
+            continue
+        for template in directory.rglob("*"):
+            if template.suffix in TEMPLATE_SUFFIXES and template.is_file():
+                text = template.read_text(encoding="utf-8", errors="replace")
+                referenced.update(STATIC_TAG_RE.findall(text))
+    return referenced
+
+
+def _manifest_patterns(manifest_path):
+    if not manifest_path:
+        return []
+    try:
+        lines = Path(manifest_path).read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        return []
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_state(path):
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_state(path, state):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(state, handle, indent=0, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _format_bytes(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
@@ -0,0 +1,76 @@
+import json
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+IMPORT_TIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)\s*$")
+CHILD_SCRIPT = "import json; from core.warmup import profile_boot; print(json.dumps(profile_boot()))"
+
+
+class Command(BaseCommand):
+    help = "Boot the project in a fresh interpreter and report per-module import time and per-phase boot cost."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=25, help="Number of modules and packages to list.")
+        parser.add_argument(
+            "--sort",
+            choices=("cumulative", "self"),
+            default="cumulative",
+            help="Order modules by cumulative (with children) or self import time.",
+        )
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        env["DJANGO_SETTINGS_MODULE"] = os.environ.get("DJANGO_SETTINGS_MODULE", "config.settings")
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", CHILD_SCRIPT],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if completed.returncode != 0:
+            tail = "\n".join(line for line in completed.stderr.splitlines() if not line.startswith("import time:"))
+            raise CommandError(f"Profiling process failed:\n{tail[-2000:]}")
+
+        output = completed.stdout.strip().splitlines()
+        try:
+            phases = json.loads(output[-1])
+        except (IndexError, ValueError) as exc:
+            raise CommandError("Profiling process did not report its boot phases.") from exc
+        modules = []
+        for line in completed.stderr.splitlines():
+            match = IMPORT_TIME_RE.match(line)
+            if match:
+                modules.append((match.group(3), int(match.group(1)), int(match.group(2))))
+
+        limit = options["limit"]
+        column = 1 if options["sort"] == "self" else 2
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Slowest imports (by {options['sort']} time)"))
+        self.stdout.write(f"{'self ms':>9} {'cumul ms':>9}  module")
+        for name, self_us, cumulative_us in sorted(modules, key=lambda item: item[column], reverse=True)[:limit]:
+            self.stdout.write(f"{self_us / 1000:>9.1f} {cumulative_us / 1000:>9.1f}  {name}")
+
+        packages = {}
+        for name, self_us, _ in modules:
+            root = name.split(".", 1)[0]
+            packages[root] = packages.get(root, 0) + self_us
+        self.stdout.write(self.style.MIGRATE_HEADING("Import time by top-level package"))
+        for root, total_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:limit]:
+            self.stdout.write(f"{total_us / 1000:>9.1f}  {root}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Boot phases"))
+        total = 0.0
+        for name, seconds, error in phases:
+            total += seconds
+            line = f"{seconds * 1000:>9.1f}  {name}"
+            self.stdout.write(self.style.ERROR(f"{line}  ({error})") if error else line)
+        self.stdout.write(self.style.SUCCESS(
+            f"{total * 1000:.1f} ms boot, {sum(item[1] for item in modules) / 1000:.1f} ms in "
+            f"{len(modules)} imports."
+        ))
@@ -1,3 +1,265 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+
+from ai import audit_log
+
+from .eligibility import EligibilityEngine
+from .management.commands.profile_startup import IMPORT_TIME_RE
+from .warmup import warm_up
+
+
+class EligibilityEngineTests(SimpleTestCase):
+    def setUp(self):
+        self.today = date.today()
+        self.engine = EligibilityEngine()
+        self.events = []
+        self.engine.subscribe(lambda donor_id, eligible_on: self.events.append((donor_id, eligible_on)))
+        self.engine.load([
+            {"donor_id": "recent", "birth_date": date(1990, 4, 2),
+             "last_donation": self.today - timedelta(days=10), "hemoglobin": 13.8},
+            {"donor_id": "ready", "birth_date": date(1990, 1, 1)},
+            {"donor_id": "low-hb", "birth_date": date(1990, 1, 1), "hemoglobin": 11.0},
+            {"donor_id": "too-old", "birth_date": date(1940, 1, 1)},
+            {"donor_id": "leapling", "birth_date": date(2000, 2, 29)},
+        ])
+
+    def test_load_evaluates_rules(self):
+        self.assertEqual(self.engine.eligible_ids(), ["ready", "leapling"])
+        self.assertEqual(self.engine.eligible_on("recent"), self.today + timedelta(days=46))
+        self.assertIsNone(self.engine.eligible_on("low-hb"))
+        self.assertIsNone(self.engine.eligible_on("too-old"))
+        self.assertEqual(self.engine.eligible_on("leapling"), date(2018, 3, 1))
+        self.assertEqual(self.engine.eligible_ids(candidates=["low-hb", "ready", "unknown"]), ["ready"])
+
+    def test_failed_load_leaves_engine_unchanged(self):
+        with self.assertRaises(ValueError):
+            self.engine.load([{"donor_id": "new"}, {"donor_id": "ready"}])
+        with self.assertRaises(KeyError):
+            self.engine.load([{"donor_id": "new"}, {"birth_date": date(1990, 1, 1)}])
+        self.assertEqual(len(self.engine), 5)
+        self.assertNotIn("new", self.engine)
+
+        self.engine.load([{"donor_id": "new", "birth_date": date(1995, 6, 1)}])
+        self.assertTrue(self.engine.is_eligible("new"))
+        self.assertEqual(self.engine.eligible_ids(), ["ready", "leapling", "new"])
+
+    def test_donation_schedules_event(self):
+        self.assertEqual(self.engine.record_donation("ready", self.today), self.today + timedelta(days=56))
+        self.assertFalse(self.engine.is_eligible("ready"))
+
+        self.assertEqual(self.engine.advance(self.today + timedelta(days=55)), [("recent", self.today + timedelta(days=46))])
+        self.assertEqual(self.engine.advance(self.today + timedelta(days=56)), [("ready", self.today + timedelta(days=56))])
+        self.assertEqual(self.events, [
+            ("recent", self.today + timedelta(days=46)),
+            ("ready", self.today + timedelta(days=56)),
+        ])
+
+    def test_donation_with_recovered_hemoglobin_is_published(self):
+        self.engine.record_donation("low-hb", self.today - timedelta(days=100), hemoglobin=13.0)
+        self.assertTrue(self.engine.is_eligible("low-hb"))
+        self.assertEqual(self.engine.advance(self.today), [("low-hb", self.today)])
+
+    def test_deferral_replaces_pending_event(self):
+        until = self.today + timedelta(days=90)
+        self.assertEqual(self.engine.record_deferral("recent", until), until)
+        self.assertEqual(self.engine.advance(self.today + timedelta(days=60)), [])
+        self.assertEqual(self.engine.advance(until), [("recent", until)])
+
+        self.assertIsNone(self.engine.record_deferral("ready", None))
+        self.assertEqual(self.engine.advance(date.max), [])
+
+    def test_clear_deferral_is_published(self):
+        self.engine.record_deferral("ready", None)
+        self.engine.advance(self.today)
+        self.assertEqual(self.engine.clear_deferral("ready"), date(2008, 1, 1))
+        self.assertTrue(self.engine.is_eligible("ready"))
+        self.assertEqual(self.engine.advance(self.today), [("ready", self.today)])
+        self.assertEqual(self.events, [("ready", self.today)])
+
+    def test_donor_with_only_an_id(self):
+        self.engine.load([{"donor_id": "bare"}])
+        self.assertTrue(self.engine.is_eligible("bare"))
+        self.assertEqual(self.engine.eligible_on("bare"), date.min)
+
+        until = self.today + timedelta(days=30)
+        self.assertEqual(self.engine.record_deferral("bare", until), until)
+        self.assertEqual(self.engine.clear_deferral("bare"), date.min)
+        self.assertEqual(self.engine.record_donation("bare", self.today), self.today + timedelta(days=56))
+
+    def test_eligible_on_follows_engine_clock(self):
+        ages_out = self.today + timedelta(days=20)
+        if (ages_out.month, ages_out.day) == (2, 29):
+            ages_out += timedelta(days=1)
+        self.engine.load([{"donor_id": "senior", "birth_date": ages_out.replace(year=ages_out.year - 66)}])
+        self.assertEqual(self.engine.eligible_on("senior"), date(ages_out.year - 48, ages_out.month, ages_out.day))
+
+        self.engine.advance(self.today + timedelta(days=30))
+        self.assertIsNone(self.engine.eligible_on("senior"))
+        self.assertIsNotNone(self.engine.eligible_on("senior", on=self.today))
+
+
+class AuditLogTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def _segments(self):
+        return audit_log.list_segments(self.directory)
+
+    def test_overflow_drops_and_counts(self):
+        log = audit_log.AuditLog(self.directory, buffer_size=3, flush_interval=60)
+        # Holding the (re-entrant) lock keeps the writer from draining the buffer.
+        with log._cond:
+            accepted = [log.append({"model": "m"}) for _ in range(5)]
+        log.close()
+
+        self.assertEqual(accepted, [True, True, True, False, False])
+        self.assertEqual(log.stats(), {"written": 3, "dropped": 2, "pending": 0})
+        [segment] = self._segments()
+        index = audit_log.read_index(segment)
+        self.assertEqual(index["count"], 3)
+        self.assertEqual(index["dropped"], 2)
+
+    def test_rotation_compresses_all_but_active_segment(self):
+        log = audit_log.AuditLog(self.directory, max_bytes=1024, flush_interval=0.01)
+        for i in range(100):
+            log.append({"model": "m", "status": 200, "i": i})
+        log.close()
+
+        segments = self._segments()
+        self.assertGreater(len(segments), 2)
+        self.assertTrue(all(path.endswith(".jsonl.gz") for path in segments[:-1]))
+        self.assertTrue(segments[-1].endswith(".jsonl"))
+        for path in segments:
+            self.assertIsNotNone(audit_log.read_index(path))
+        entries = [entry["i"] for path in segments for entry in audit_log.iter_entries(path, audit_log.read_index(path))]
+        self.assertEqual(entries, list(range(100)))
+
+    def test_since_seek_matches_full_scan(self):
+        log = audit_log.AuditLog(self.directory, compress=False, buffer_size=5000, flush_interval=0.01)
+        for i in range(1000):
+            log.append({"model": "m", "i": i})
+        log.close()
+
+        [segment] = self._segments()
+        index = audit_log.read_index(segment)
+        self.assertGreater(len(index["offsets"]), 1)
+        everything = list(audit_log.iter_entries(segment))
+        since = everything[600]["ts"]
+        self.assertEqual(
+            list(audit_log.iter_entries(segment, index, since=since)),
+            [entry for entry in everything if entry["ts"] >= since],
+        )
+
+    def test_query_command_aggregates_by_model_and_status(self):
+        log = audit_log.AuditLog(self.directory, flush_interval=0.01)
+        for i in range(12):
+            log.append({"model": f"m{i % 2}", "status": 500 if i % 3 == 0 else 200, "latency_ms": i})
+        log.close()
+
+        out = StringIO()
+        call_command("ai_audit_log", dir=self.directory, model="m1", status="500", stdout=out)
+        rows = [line.split() for line in out.getvalue().splitlines()[1:-1]]
+        # m1 with status 500: i = 3 and 9.
+        self.assertEqual(rows, [["m1", "500", "2", "6.0", "9.0"]])
+        self.assertIn("2 entries", out.getvalue())
+
+    def test_record_truncates_error_body(self):
+        sink = mock.Mock()
+        with mock.patch.object(audit_log, "get_audit_log", return_value=sink):
+            audit_log.record("POST", "https://proxy/ai", "m", {
+                "success": False,
+                "status": 502,
+                "error": "x" * 10000,
+            }, started=0.0)
+        entry = sink.append.call_args.args[0]
+        self.assertEqual(entry["status"], 502)
+        self.assertEqual(len(entry["error"]), audit_log.ERROR_MAX_CHARS + 3)
+
+
+class CollectAssetsTests(SimpleTestCase):
+    def setUp(self):
+        workspace = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, workspace)
+        source = workspace / "src"
+        (source / "css").mkdir(parents=True)
+        (source / "vendor").mkdir()
+        # Referenced from base.html; compressible, so it gets a .gz variant.
+        (source / "css" / "custom.css").write_text("body { color: red; }\n" * 200)
+        # On the manifest; too small for gzip to help.
+        (source / "vendor" / "keep.js").write_text("x")
+        (source / "vendor" / "skip.js").write_text("not selected")
+        manifest = workspace / "manifest.txt"
+        manifest.write_text("# test manifest\nvendor/keep.js\n")
+
+        self.static_root = workspace / "static_root"
+        settings_override = override_settings(
+            STATIC_ROOT=self.static_root,
+            STATICFILES_DIRS=[source],
+            STATICFILES_FINDERS=["django.contrib.staticfiles.finders.FileSystemFinder"],
+            STATIC_ASSET_MANIFEST=manifest,
+            STATIC_COLLECT_STATE=workspace / "state.json",
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _collect(self, **options):
+        out = StringIO()
+        call_command("collect_assets", stdout=out, stderr=StringIO(), workers=2, **options)
+        return out.getvalue()
+
+    def test_unchanged_files_are_skipped_and_missing_outputs_recopied(self):
+        self.assertIn("2 copied", self._collect())
+        self.assertTrue((self.static_root / "css" / "custom.css.gz").is_file())
+        self.assertFalse((self.static_root / "vendor" / "keep.js.gz").exists())
+        self.assertFalse((self.static_root / "vendor" / "skip.js").exists())
+
+        self.assertIn("0 copied", self._collect())
+
+        (self.static_root / "vendor" / "keep.js").unlink()
+        self.assertIn("1 copied", self._collect())
+        (self.static_root / "css" / "custom.css.gz").unlink()
+        self.assertIn("1 copied", self._collect())
+        self.assertTrue((self.static_root / "css" / "custom.css.gz").is_file())
+        self.assertIn("0 copied", self._collect())
+
+    def test_prune_is_opt_in_and_keeps_selected_outputs(self):
+        stale = self.static_root / "old" / "stale.js"
+        stale.parent.mkdir(parents=True)
+        stale.write_text("left over")
+
+        self._collect()
+        self.assertTrue(stale.is_file())
+
+        self.assertIn("1 unselected removed", self._collect(prune=True))
+        self.assertFalse(stale.parent.exists())
+        remaining = sorted(
+            path.relative_to(self.static_root).as_posix() for path in self.static_root.rglob("*") if path.is_file()
+        )
+        self.assertEqual(remaining, ["css/custom.css", "css/custom.css.gz", "vendor/keep.js"])
+
+
+class WarmupTests(SimpleTestCase):
+    def test_warm_up_runs_fork_safe_phases(self):
+        results = warm_up()
+        self.assertEqual([(name, error) for name, _, error in results],
+                         [("templates", None), ("urlconf", None), ("ai_config", None)])
+        self.assertTrue(all(seconds >= 0 for _, seconds, _ in results))
+
+    def test_import_time_line_is_parsed(self):
+        match = IMPORT_TIME_RE.match("import time:       450 |       5980 |         re")
+        self.assertEqual(match.groups(), ("450", "5980", "re"))
+        self.assertIsNone(IMPORT_TIME_RE.match("import time: self [us] | cumulative | imported package"))
+
+    def test_profile_startup_reports_missing_child_output(self):
+        completed = mock.Mock(returncode=0, stdout="", stderr="")
+        with mock.patch("core.management.commands.profile_startup.subprocess.run", return_value=completed):
+            with self.assertRaises(CommandError):
+                call_command("profile_startup", stdout=StringIO())
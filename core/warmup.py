@@ -0,0 +1,139 @@
+"""
+Worker warm-up and boot profiling.
+
+``warm_up()`` runs from config/wsgi.py and config/asgi.py once the application
+is built, so the first request after a deploy or scale-up does not pay for
+template compilation, URLconf loading or AI config parsing. It holds no
+sockets or threads, so it is safe in a preloading master before fork.
+
+``warm_up_worker()`` opens DB connections and starts the AI audit writer. Both
+are per process, and Django connections are per thread, so it belongs in a
+server hook that runs in the thread that will serve requests, e.g. gunicorn's
+``post_worker_init`` with sync workers (see README).
+
+Django is imported inside the functions so ``profile_boot()`` can time
+every boot phase from a cold interpreter.
+"""
+
+import logging
+import os
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up():
+    """Run the fork-safe phases; returns ``[(phase, seconds, error_or_None), ...]``."""
+    return _run_phases(WARMUP_PHASES)
+
+
+def warm_up_worker():
+    """Run the per-worker phases in the current process and thread."""
+    return _run_phases(WORKER_PHASES)
+
+
+def _run_phases(phases):
+    results = []
+    for name, phase in phases:
+        started = time.perf_counter()
+        error = None
+        try:
+            phase()
+        except Exception as exc:  # pylint: disable=broad-except
+            error = f"{type(exc).__name__}: {exc}"
+            logger.warning("Warm-up phase %s failed: %s", name, error)
+        results.append((name, time.perf_counter() - started, error))
+    return results
+
+
+def profile_boot():
+    """Time each boot phase in the current (fresh) process, warm-up included.
+
+    The audit log phase is left out so profiling never writes audit segments.
+    """
+    results = []
+
+    started = time.perf_counter()
+    from django.conf import settings
+
+    settings.INSTALLED_APPS  # noqa: B018 - forces config.settings (and load_dotenv) to run
+    results.append(("settings", time.perf_counter() - started, None))
+
+    started = time.perf_counter()
+    import django
+
+    django.setup()
+    results.append(("apps", time.perf_counter() - started, None))
+
+    started = time.perf_counter()
+    from django.core.handlers.wsgi import WSGIHandler
+
+    WSGIHandler()
+    results.append(("wsgi_handler", time.perf_counter() - started, None))
+
+    results.extend(warm_up())
+    # The audit writer would create segments in the real AI_AUDIT_LOG_DIR.
+    results.extend(_run_phases([phase for phase in WORKER_PHASES if phase[0] != "audit_log"]))
+    return results
+
+
+def _compile_templates():
+    from django.apps import apps
+    from django.conf import settings
+    from django.template import engines
+
+    base_dir = Path(settings.BASE_DIR).resolve()
+    for engine in engines.all():
+        directories = [Path(directory) for directory in engine.dirs]
+        if engine.app_dirs:
+            directories.extend(Path(app.path) / "templates" for app in apps.get_app_configs())
+        for directory in directories:
+            # Only project templates; the admin's stay lazy.
+            directory = directory.resolve()
+            if not directory.is_dir() or base_dir not in directory.parents:
+                continue
+            for template in directory.rglob("*.html"):
+                engine.get_template(template.relative_to(directory).as_posix())
+
+
+def _load_urlconf():
+    from django.urls import get_resolver
+
+    resolver = get_resolver()
+    resolver.url_patterns  # noqa: B018 - imports the URLconf modules and views
+    resolver.reverse_dict  # noqa: B018 - builds the reverse lookup tables
+
+
+def _open_db_connections():
+    from django.db import connections
+
+    for alias in connections:
+        # Without persistent connections Django closes this one when the first request starts.
+        if connections.settings[alias].get("CONN_MAX_AGE"):
+            connections[alias].ensure_connection()
+
+
+def _load_ai_config():
+    from ai import local_ai_api
+
+    local_ai_api.warm_up()
+
+
+def _start_audit_log():
+    if os.getenv("AI_AUDIT_LOG_DIR"):
+        from ai import audit_log
+
+        audit_log.get_audit_log()
+
+
+WARMUP_PHASES = [
+    ("templates", _compile_templates),
+    ("urlconf", _load_urlconf),
+    ("ai_config", _load_ai_config),
+]
+
+WORKER_PHASES = [
+    ("database", _open_db_connections),
+    ("audit_log", _start_audit_log),
+]